@@ -1,15 +1,43 @@
 from getRecentAPIData import get_latest_sample_timestamp
 from localHashes_Check import last_modified
-from datetime import datetime
-import os
-import json
-from paths import get_metadata_path
+from datetime import datetime, timezone
+import time
+from metadata import load_metadata, update_metadata
+from timestamps import is_timestamp
+
+# How long (seconds) the API's latest timestamp is reused before asking again
+API_CHECK_TTL = 900
 
 def _parse_ts(s: str):
+    # fromisoformat is implemented in C and handles the usual shapes (space or
+    # "T" separator, fractions, offsets); strptime only covers values that
+    # aren't zero-padded, which fromisoformat rejects.
     try:
-        return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
-    except Exception:
-        return None
+        dt = datetime.fromisoformat(s)
+    except (TypeError, ValueError):
+        try:
+            return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
+        except Exception:
+            return None
+    # MalwareBazaar timestamps are UTC; keep everything naive so they compare
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _at_least(ts, reference):
+    """Return True if ts is the same as or newer than reference, None if they can't be compared.
+
+    Well-formed timestamps are compared as plain strings; parsing is only
+    attempted as a fallback for values in some other shape.
+    """
+    if is_timestamp(ts) and is_timestamp(reference):
+        return ts >= reference
+    ts_dt = _parse_ts(ts) if ts else None
+    reference_dt = _parse_ts(reference) if reference else None
+    if ts_dt and reference_dt:
+        return ts_dt >= reference_dt
+    return None
 
 
 def main() -> bool:
@@ -18,30 +46,32 @@ def main() -> bool:
     This treats the local CSV's newest `first_seen` as up-to-date when it is
     equal to or newer than the API's latest sample timestamp.
     """
-    latest = get_latest_sample_timestamp()
+    meta = load_metadata()
+
+    # Reuse a recent answer from the API instead of a network round-trip per scan
+    last_check = meta.get("last_api_check")
+    if isinstance(last_check, (int, float)) and 0 <= time.time() - last_check < API_CHECK_TTL:
+        latest = meta.get("api_latest_timestamp")
+        print("Using cached API timestamp from the last check.")
+    else:
+        latest = get_latest_sample_timestamp()
+        if latest:
+            try:
+                update_metadata(api_latest_timestamp=latest, last_api_check=time.time())
+            except Exception as e:
+                print("Failed to cache API timestamp:", e)
 
     print("API latest sample timestamp:", latest)
     print("Local CSV newest first_seen:", last_modified)
 
-    latest_dt = _parse_ts(latest) if latest else None
-    local_dt = _parse_ts(last_modified) if last_modified else None
-
     # Check metadata (written after successful import) as an authoritative signal
-    try:
-        metadata_path = get_metadata_path()
-        if os.path.exists(metadata_path):
-            with open(metadata_path, "r", encoding="utf-8") as mf:
-                meta = json.load(mf)
-            meta_ts = _parse_ts(meta.get("last_api_timestamp"))
-            if meta_ts and latest_dt and meta_ts >= latest_dt:
-                print("Database is up to date (metadata).")
-                return True
-    except Exception:
-        # metadata read failure should not break the check; fall back to CSV comparison
-        pass
-
-    if latest_dt and local_dt:
-        if local_dt >= latest_dt:
+    if _at_least(meta.get("last_api_timestamp"), latest):
+        print("Database is up to date (metadata).")
+        return True
+
+    local_is_current = _at_least(last_modified, latest)
+    if local_is_current is not None:
+        if local_is_current:
             print("Database is up to date")
             return True
         else:
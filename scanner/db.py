@@ -1,16 +1,89 @@
+import atexit
 import sqlite3
+import threading
 from paths import get_user_db_path
 
+# Per-connection tuning. journal_mode=WAL is persistent in the database file and
+# is set once by init_db; these have to be re-applied on every open.
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
 def get_connection():
-    return sqlite3.connect(get_user_db_path())
+    conn = sqlite3.connect(get_user_db_path())
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+LOOKUP_SQL = "SELECT malware_name, malware_family FROM malware_hashes WHERE sha256 = ?"
+
+# Lookups reuse one read-only connection for the life of the process rather
+# than reconnecting per call. The lock lets scans on other threads share it.
+_read_conn = None
+_read_lock = threading.Lock()
+
+def get_read_connection():
+    """Return the process-wide read-only connection, opening it on first use.
+
+    Shared by every reader (and thread) instead of each opening its own; do not
+    close it. Writers use a short-lived get_connection() instead.
+    """
+    global _read_conn
+    if _read_conn is None:
+        conn = sqlite3.connect(get_user_db_path(), check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.execute("PRAGMA query_only=1")
+        atexit.register(conn.close)
+        _read_conn = conn
+    return _read_conn
+
+# Optional in-memory copy of every known sha256 (see load_hash_set). Most
+# scanned files are clean, so most lookups end at a set miss.
+HASH_SET_MAX_ROWS = 500_000
+
+# Loading the set costs about as much per row as a tenth of a SQLite miss, so it
+# only pays off once a batch has at least one file per this many stored hashes.
+HASH_SET_ROWS_PER_FILE = 10
+_hash_set = None
+
+def load_hash_set(max_rows=HASH_SET_MAX_ROWS):
+    """Snapshot all known hashes into memory so check_hash misses skip SQLite.
+
+    Meant for batch scans, where the one-off table scan pays for itself.
+    Returns False and leaves lookups on SQLite if the table is missing or
+    holds more than max_rows hashes.
+    """
+    global _hash_set
+    with _read_lock:
+        _hash_set = None
+        conn = get_read_connection()
+        try:
+            count = conn.execute("SELECT COUNT(*) FROM malware_hashes").fetchone()[0]
+            if count > max_rows:
+                return False
+            _hash_set = {sha256 for (sha256,) in conn.execute("SELECT sha256 FROM malware_hashes")}
+        except sqlite3.OperationalError:
+            return False
+    return True
 
 def check_hash(sha256_hash):
-    conn = get_connection()
-    c = conn.cursor()
+    # hashes are stored as raw 32-byte digests; accept the usual hex string too
+    if isinstance(sha256_hash, str):
+        try:
+            sha256_hash = bytes.fromhex(sha256_hash)
+        except ValueError:
+            return None
+
+    if _hash_set is not None and sha256_hash not in _hash_set:
+        return None
 
     try:
-        c.execute("SELECT malware_name, malware_family FROM malware_hashes WHERE sha256 = ?", (sha256_hash,))
-        result = c.fetchone()
+        with _read_lock:
+            result = get_read_connection().execute(LOOKUP_SQL, (sha256_hash,)).fetchone()
     except sqlite3.OperationalError as e:
         # handle missing-table gracefully (database may not have been initialized)
         if 'no such table' in str(e):
@@ -18,8 +91,6 @@ def check_hash(sha256_hash):
             result = None
         else:
             raise
-    finally:
-        conn.close()
 
     return result
 
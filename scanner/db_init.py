@@ -1,6 +1,7 @@
 """Database initialization wrapper for guaranteed schema setup."""
 import os
 from paths import get_user_db_path, get_user_csv_path
+from db import get_connection
 from init_db import init_user_db
 from import_hashes import import_user_hashes
 
@@ -12,27 +13,27 @@ def ensure_user_db_exists():
     Returns: path to the database
     """
     db_path = get_user_db_path()
-    
-    # Initialize schema if needed
-    init_user_db()
-    
-    # If CSV exists but DB is empty, populate it
-    csv_path = get_user_csv_path()
-    if os.path.exists(csv_path):
-        # Check if DB has any data
-        import sqlite3
-        try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM malware_hashes")
-            count = cursor.fetchone()[0]
-            conn.close()
-            
-            # Import only if DB is empty
-            if count == 0:
-                print("Database empty - importing hashes...")
-                import_user_hashes()
-        except Exception as e:
-            print(f"Warning checking DB: {e}")
+
+    # Schema setup, the emptiness check and any import share one connection
+    conn = get_connection()
+    try:
+        # Initialize schema if needed
+        init_user_db(conn)
+
+        # If CSV exists but DB is empty, populate it
+        csv_path = get_user_csv_path()
+        if os.path.exists(csv_path):
+            # Check if DB has any data
+            try:
+                is_empty = conn.execute("SELECT 1 FROM malware_hashes LIMIT 1").fetchone() is None
+
+                # Import only if DB is empty
+                if is_empty:
+                    print("Database empty - importing hashes...")
+                    import_user_hashes(conn)
+            except Exception as e:
+                print(f"Warning checking DB: {e}")
+    finally:
+        conn.close()
     
     return db_path
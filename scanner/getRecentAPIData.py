@@ -1,5 +1,5 @@
 import requests
-from datetime import datetime
+from timestamps import newest_timestamp
 
 API_URL = "https://mb-api.abuse.ch/api/v1/"
 API_KEY = "adc7c0f7a891ecac5b5302f3313ef888d76cff355cc442df"  # Put your actual Auth-Key here
@@ -33,13 +33,9 @@ def get_latest_sample_timestamp():
             return None
 
        
-        timestamps = [item["first_seen"] for item in recent_samples if "first_seen" in item] 
-        datetime_stamps = [datetime.strptime(ts, "%Y-%m-%d %H:%M:%S") for ts in timestamps]
-
-      
-        newest_dt = max(datetime_stamps) # finding the newest date
-        
-        return newest_dt.strftime("%Y-%m-%d %H:%M:%S") #turns baCK INTO a string
+        # the timestamps are zero-padded "YYYY-MM-DD HH:MM:SS" strings, so the
+        # newest one can be picked by plain string comparison
+        return newest_timestamp(item.get("first_seen") for item in recent_samples)
 
 
     except Exception as e:
@@ -0,0 +1,25 @@
+"""Helpers for reading MalwareBazaar CSV exports.
+
+The dumps open with a block of '#' comment lines whose last line is the quoted
+column header, so the header has to be dug out before csv.reader takes over.
+"""
+import csv
+
+# Read buffer for the CSV; far fewer read() calls than the 8 KiB default.
+CSV_BUFFER_SIZE = 1 << 20
+
+def read_csv_header(csvfile):
+    """Consume the leading comment block and return the column names.
+
+    MalwareBazaar exports start with '#' comment lines, the last of which is the
+    quoted column header. Later comment lines (e.g. the entry count at the end)
+    have too few fields to fill the hash columns and get dropped with other
+    short rows.
+    """
+    while line := csvfile.readline():
+        if line.startswith("#") and ',' in line and '"' in line:
+            return next(csv.reader([line.lstrip("#").lstrip()], skipinitialspace=True))
+        if not line.startswith("#"):
+            # no commented header; a plain CSV starts with its own header row
+            return next(csv.reader([line], skipinitialspace=True), [])
+    return []
@@ -1,32 +1,75 @@
 import csv
-import sqlite3
 import os
-import json
 from datetime import datetime
-from paths import get_user_csv_path, get_user_db_path, get_metadata_path
+from itertools import islice
+from operator import itemgetter
+from paths import get_user_csv_path, get_metadata_path
+from db import get_connection
+from metadata import update_metadata
+from timestamps import is_timestamp, newest_timestamp
+from hash_csv import CSV_BUFFER_SIZE, read_csv_header
 
-def _newest_first_seen_from_csv(path: str):
-    newest = None
+# Rows are handed to executemany() in chunks of this size so huge CSVs never
+# have to be materialized as one giant list of tuples.
+BATCH_SIZE = 10_000
+
+# CSV columns that feed (sha256, malware_name, malware_family, source)
+HASH_COLUMNS = ("sha256_hash", "signature", "file_type_guess", "reporter")
+
+# Rows are staged in an unindexed temp table and merged into malware_hashes in
+# key order, so its WITHOUT ROWID B-tree is filled front to back instead of at
+# random. Ordering by rowid within a key keeps the first row for each sha256,
+# as inserting row by row with INSERT OR IGNORE would.
+STAGING_TABLE_SQL = """
+CREATE TEMP TABLE staging_hashes (sha256 BLOB, malware_name TEXT, malware_family TEXT, source TEXT)
+"""
+
+INSERT_SQL = "INSERT INTO temp.staging_hashes VALUES (?, ?, ?, ?)"
+
+MERGE_SQL = """
+INSERT OR IGNORE INTO malware_hashes (sha256, malware_name, malware_family, source)
+SELECT sha256, malware_name, malware_family, source FROM temp.staging_hashes ORDER BY sha256, rowid
+"""
+
+def _column_positions(header, columns):
+    missing = [c for c in columns if c not in header]
+    if missing:
+        raise ValueError(f"CSV header is missing expected columns: {', '.join(missing)}")
+    return [header.index(c) for c in columns]
+
+def _newest_first_seen(values):
+    """Return the newest timestamp in a list of first_seen values, or None."""
+    # max() runs in C; only fall back to the validating scan when the winner
+    # is not a timestamp (e.g. a stray "n/a", which sorts after digits)
+    candidate = max(values, default=None)
+    return candidate if is_timestamp(candidate) else newest_timestamp(values)
+
+def _hex_to_bytes(value):
     try:
-        with open(path, newline='', encoding='utf-8') as f:
-            reader = csv.reader((line.lstrip('#').strip() for line in f if line.strip() and not line.startswith('##')),
-                                skipinitialspace=True)
-            for row in reader:
-                if not row:
-                    continue
-                ts = row[0].strip().strip('"')
-                try:
-                    dt = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-                except Exception:
-                    continue
-                if newest is None or dt > newest:
-                    newest = dt
-    except Exception:
+        return bytes.fromhex(value)
+    except ValueError:
         return None
-    return newest
 
-def import_user_hashes():
-    """Import hashes from CSV into the database. Can be called multiple times."""
+def _hash_params(batch, getters):
+    """Return executemany() parameters for a batch of csv rows, one column at a time.
+
+    sha256 is stored as raw bytes; bytes.fromhex ignores surrounding whitespace
+    and letter case, so no strip()/lower() is needed. Rows whose hash is not
+    valid hex are dropped.
+    """
+    columns = [list(map(getter, batch)) for getter in getters]
+    try:
+        columns[0] = list(map(bytes.fromhex, columns[0]))
+    except ValueError:
+        columns[0] = list(map(_hex_to_bytes, columns[0]))
+        return [row for row in zip(*columns) if row[0] is not None]
+    return zip(*columns)
+
+def import_user_hashes(conn=None):
+    """Import hashes from CSV into the database. Can be called multiple times.
+
+    Pass an open connection to reuse it; otherwise one is opened and closed here.
+    """
     CSV_PATH = get_user_csv_path()
     
     # Check if CSV exists
@@ -34,50 +77,55 @@ def import_user_hashes():
         print(f"CSV file not found at {CSV_PATH}")
         return False
     
-    conn = sqlite3.connect(get_user_db_path())
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        with open(CSV_PATH, newline='', encoding="utf-8") as csvfile:
-            # Process lines: skip pure comment lines, but keep and clean the header
-            processed_lines = []
-            for line in csvfile:
-                if line.startswith("#") and ',' in line and '"' in line:
-                    # This is the header line (starts with # but contains quoted field names)
-                    processed_lines.append(line.lstrip("#").lstrip())
-                elif not line.startswith("#"):
-                    # Keep data lines, skip pure comment lines
-                    processed_lines.append(line)
-            
-            reader = csv.DictReader(processed_lines, skipinitialspace=True)
-
-            for row in reader:
-                try:
-                    cursor.execute("""
-                    INSERT OR IGNORE INTO malware_hashes (sha256, malware_name, malware_family, source)
-                    VALUES (?, ?, ?, ?)
-                    """, (
-                        row["sha256_hash"].strip().lower(),
-                        row.get("signature", "Unknown"),
-                        row.get("file_type_guess", "Unknown"),
-                        row.get("reporter", "MalwareBazaar")
-                    ))
-                except Exception as e:
-                    print("Error inserting row:", e)
+        with open(CSV_PATH, newline='', encoding="utf-8", buffering=CSV_BUFFER_SIZE) as csvfile:
+            # Only the leading comment block goes through Python; the rest of
+            # the file is handed straight to the C csv parser.
+            header = read_csv_header(csvfile)
+            reader = csv.reader(csvfile, skipinitialspace=True)
+            positions = _column_positions(header, HASH_COLUMNS)
+            getters = [itemgetter(p) for p in positions]
+            first_seen = itemgetter(header.index("first_seen_utc")) if "first_seen_utc" in header else None
+            min_width = max(positions) + 1
+
+            # Load everything inside one explicit transaction, batch by batch.
+            cursor.execute("BEGIN")
+            cursor.execute("DROP TABLE IF EXISTS temp.staging_hashes")
+            cursor.execute(STAGING_TABLE_SQL)
+
+            newest = None
+            while batch := list(islice(reader, BATCH_SIZE)):
+                if min(map(len, batch)) < min_width:
+                    # blank, truncated or comment lines can't be projected; drop them
+                    batch = [row for row in batch if len(row) >= min_width]
+
+                # the newest first_seen comes out of the same pass as the insert
+                if first_seen:
+                    batch_newest = _newest_first_seen(list(map(first_seen, batch)))
+                    if batch_newest and (newest is None or batch_newest > newest):
+                        newest = batch_newest
+
+                cursor.executemany(INSERT_SQL, _hash_params(batch, getters))
+
+            cursor.execute(MERGE_SQL)
+            cursor.execute("DROP TABLE temp.staging_hashes")
 
         conn.commit()
 
         # --- write metadata so update/freshness checks can be reliable ---
         metadata_path = get_metadata_path()
-        _newest = _newest_first_seen_from_csv(CSV_PATH)
-        if _newest:
-            meta = {
-                "last_api_timestamp": _newest.strftime("%Y-%m-%d %H:%M:%S"),
-                "last_import_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-            }
+        if newest:
             try:
-                with open(metadata_path, "w", encoding="utf-8") as mf:
-                    json.dump(meta, mf)
+                # merge rather than overwrite so the download's HTTP validators survive
+                update_metadata(
+                    last_api_timestamp=newest,
+                    last_import_at=datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+                )
                 print(f"Metadata written to {metadata_path}")
             except Exception as e:
                 print("Failed to write metadata:", e)
@@ -85,10 +133,12 @@ def import_user_hashes():
         print("Import complete.")
         return True
     except Exception as e:
+        conn.rollback()
         print(f"Import failed: {e}")
         return False
     finally:
-        conn.close()
+        if owns_conn:
+            conn.close()
 
 # Legacy CLI support
 if __name__ == "__main__":
@@ -1,40 +1,103 @@
-import sqlite3
-from paths import get_user_db_path
+from db import get_connection
 
-def init_user_db():
-    """Initialize the malware hashes database schema. Idempotent - safe to call multiple times."""
-    conn = sqlite3.connect(get_user_db_path())
-    c = conn.cursor()
+# sha256 holds the raw 32-byte digest rather than 64 hex characters, halving
+# the key size. WITHOUT ROWID makes sha256 the table's own B-tree key, so a
+# lookup is one traversal instead of index -> rowid -> row.
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS malware_hashes (
+    sha256 BLOB PRIMARY KEY,
+    malware_name TEXT,
+    malware_family TEXT,
+    source TEXT
+) WITHOUT ROWID
+"""
+
+def _table_sql(c):
+    row = c.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'malware_hashes'").fetchone()
+    return row[0] if row else None
+
+def _sha256_column_type(c):
+    for row in c.execute("PRAGMA table_info(malware_hashes)").fetchall():
+        if row[1] == "sha256":
+            return row[2].upper()
+    return None
 
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS malware_hashes (
-        sha256 TEXT PRIMARY KEY,
-        malware_name TEXT,
-        malware_family TEXT,
-        source TEXT
-    )
-    """)
+def _binary_rows(rows):
+    for sha256, malware_name, malware_family, source in rows:
+        if sha256 is None:
+            # a NULL key could never have matched a scanned file
+            continue
+        if isinstance(sha256, bytes):
+            # already a digest; converting it again would lose the row
+            yield sha256, malware_name, malware_family, source
+            continue
+        try:
+            yield bytes.fromhex(sha256), malware_name, malware_family, source
+        except ValueError:
+            # not a hex digest, so it could never have matched a scanned file
+            continue
 
+def _migrate_table(conn):
+    """Rebuild an older malware_hashes layout as the current one, keeping its rows."""
+    c = conn.cursor()
+    # Take the write lock before looking at the schema: another scan may have
+    # upgraded the table while this one waited, and migrating it twice would
+    # treat the converted rows as the old layout.
+    c.execute("BEGIN IMMEDIATE")
+    table_sql = _table_sql(c)
+    if not table_sql or "WITHOUT ROWID" in table_sql.upper():
+        conn.rollback()
+        return
+    text_hashes = _sha256_column_type(c) == "TEXT"
+
+    print("Upgrading the malware_hashes table...")
+    c.execute("DROP INDEX IF EXISTS idx_sha256")
+    c.execute("ALTER TABLE malware_hashes RENAME TO malware_hashes_old")
+    c.execute(CREATE_TABLE_SQL)
+    if text_hashes:
+        # hex TEXT hashes are converted to digests in Python
+        old_rows = conn.execute("SELECT sha256, malware_name, malware_family, source FROM malware_hashes_old ORDER BY sha256")
+        c.executemany("INSERT OR IGNORE INTO malware_hashes VALUES (?, ?, ?, ?)", _binary_rows(old_rows))
+        old_rows.close()
+    else:
+        c.execute("""
+        INSERT OR IGNORE INTO malware_hashes
+        SELECT sha256, malware_name, malware_family, source FROM malware_hashes_old ORDER BY sha256
+        """)
+    c.execute("DROP TABLE malware_hashes_old")
     conn.commit()
-    conn.close()
 
-    print("Database initialized.")
+def init_user_db(conn=None):
+    """Initialize the malware hashes database schema. Idempotent - safe to call multiple times.
 
-if __name__ == "__main__":
-    conn = sqlite3.connect(get_user_db_path())
+    Pass an open connection to reuse it; otherwise one is opened and closed here.
+    """
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_connection()
     c = conn.cursor()
 
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS malware_hashes (
-        sha256 TEXT PRIMARY KEY,
-        malware_name TEXT,
-        malware_family TEXT,
-        source TEXT
-    )
-    """)
+    # Larger pages fit more of the short hash rows per read. This only takes
+    # effect on a new database, so it has to come before anything is written.
+    c.execute("PRAGMA page_size=8192")
+
+    # WAL is persistent, so switching once here covers every later connection.
+    c.execute("PRAGMA journal_mode=WAL")
+
+    # Older databases use a rowid table, with hex TEXT hashes before the BLOB switch.
+    # This is only a cheap pre-check; _migrate_table confirms it under the lock.
+    table_sql = _table_sql(c)
+    if table_sql and "WITHOUT ROWID" not in table_sql.upper():
+        _migrate_table(conn)
+
+    c.execute(CREATE_TABLE_SQL)
 
     conn.commit()
-    conn.close()
+    if owns_conn:
+        conn.close()
 
     print("Database initialized.")
-    #Run once via terminal: python init_db.py
\ No newline at end of file
+
+if __name__ == "__main__":
+    init_user_db()
+    #Run once via terminal: python init_db.py
@@ -2,6 +2,8 @@ import os
 import csv
 from datetime import datetime
 from paths import get_user_csv_path
+from timestamps import newest_timestamp
+from hash_csv import CSV_BUFFER_SIZE, read_csv_header
 
 file_path = get_user_csv_path()
 
@@ -10,33 +12,23 @@ file_path = get_user_csv_path()
 # fails, fall back to the file modification time.
 
 def _newest_first_seen_from_csv(path: str):
-    newest = None
     try:
-        with open(path, newline='', encoding='utf-8') as f:
-            reader = csv.reader((line.lstrip('#').strip() for line in f if line.strip() and not line.startswith('##')),
-                                skipinitialspace=True)
-            for row in reader:
-                # header line will contain 'first_seen' as the first field; skip it
-                if not row:
-                    continue
-                # Normalize quoted values and take first column as timestamp
-                ts = row[0].strip().strip('"')
-                try:
-                    dt = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-                except Exception:
-                    # header or malformed line — skip
-                    continue
-                if newest is None or dt > newest:
-                    newest = dt
+        with open(path, newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as f:
+            # Skip the comment block, then stream the data rows straight from the
+            # file; newest_timestamp() compares the zero-padded strings directly
+            # and ignores malformed values.
+            header = read_csv_header(f)
+            if "first_seen_utc" not in header:
+                return None
+            col = header.index("first_seen_utc")
+            reader = csv.reader(f, skipinitialspace=True)
+            return newest_timestamp(row[col] for row in reader if len(row) > col)
     except FileNotFoundError:
         return None
-    return newest
 
 
-_newest = _newest_first_seen_from_csv(file_path)
-if _newest:
-    last_modified = _newest.strftime("%Y-%m-%d %H:%M:%S")
-else:
+last_modified = _newest_first_seen_from_csv(file_path)
+if not last_modified:
     # fallback to filesystem modification time
     try:
         if os.path.exists(file_path):
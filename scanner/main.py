@@ -1,14 +1,80 @@
+import os
+import stat
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 from db_init import ensure_user_db_exists
 from hashing import sha256_file
-from db import check_hash
+from db import check_hash, load_hash_set, HASH_SET_MAX_ROWS, HASH_SET_ROWS_PER_FILE
 from API_LocalComparison import main as check_db
 from file_type_detector import investigate_file
 from update_hashes import main as update_hashes_main
 from ui import show_scan_result, show_error
 
+# Batches below this size never consider the in-memory hash set
+HASH_SET_MIN_BATCH = 1000
+
+def _scan_one(path):
+    try:
+        # FIFOs and device nodes would block open() forever and stall the pool
+        if not stat.S_ISREG(os.stat(path).st_mode):
+            print(f"Warning: skipping {path}: not a regular file")
+            return path, None, None
+        file_hash = sha256_file(path)
+    except OSError as e:
+        print(f"Warning: could not read {path}: {e}")
+        return path, None, None
+    return path, file_hash, check_hash(file_hash)
+
+def scan_paths(paths):
+    """Hash and look up many files concurrently.
+
+    Returns (path, file_hash, match) tuples in input order, where match is the
+    (malware_name, malware_family) row or None; unreadable and non-regular
+    files get a None hash. hashlib releases the GIL while hashing, so threads
+    overlap file I/O and hashing, and the lookups share db's read-only
+    connection. Batches large relative to the table first load db's in-memory
+    hash set.
+    """
+    paths = list(paths)
+    # Smaller batches are cheaper to look up in SQLite one by one than to pay
+    # for a full table scan (and its COUNT) up front.
+    if len(paths) >= HASH_SET_MIN_BATCH:
+        # loads only when the table is small relative to the batch
+        load_hash_set(max_rows=min(HASH_SET_MAX_ROWS, len(paths) * HASH_SET_ROWS_PER_FILE))
+    with ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2) as executor:
+        return list(executor.map(_scan_one, paths))
+
+def _malware_verdict(file_path, file_hash, result):
+    malware_name, malware_family = result
+    return {
+        "file_path": file_path,
+        "file_hash": file_hash,
+        "known_malware": True,
+        "malware_name": malware_name,
+        "malware_family": malware_family,
+        "detection_method": "Threat intelligence hash match"
+    }
+
+def scan_directory(dir_path):
+    """Hash-match every file under dir_path and print the matches as JSON."""
+    paths = [os.path.join(root, name) for root, _, names in os.walk(dir_path) for name in names]
+    results = scan_paths(paths)
+    summary = {
+        "directory": dir_path,
+        "files_scanned": sum(1 for _, file_hash, _ in results if file_hash),
+        "matches": [_malware_verdict(path, file_hash, result)
+                    for path, file_hash, result in results if result]
+    }
+    print(json.dumps(summary, indent=2))
+    return summary
+
 def main(file_path, force: bool = False, cli_mode: bool = False):
+    # Directory results are JSON on stdout only, which the windowed build never
+    # shows; refuse up front so the caller reports it instead.
+    if os.path.isdir(file_path) and not cli_mode:
+        raise ValueError("Directory scans print their results to the console; run them with --cli.")
+
     # Ensure database is initialized before any operations
     ensure_user_db_exists()
     
@@ -36,19 +102,17 @@ def main(file_path, force: bool = False, cli_mode: bool = False):
         except Exception as e:
             print(f"Programmatic update failed: {e}")
 
+    # directories (--cli only) get a parallel hash-match pass; heuristic
+    # analysis and the result window stay per-file
+    if os.path.isdir(file_path):
+        scan_directory(file_path)
+        return
+
     file_hash = sha256_file(file_path)
     result = check_hash(file_hash)
 
     if result:
-        malware_name, malware_family = result
-        verdict = {
-            "file_path": file_path,
-            "file_hash": file_hash,
-            "known_malware": True,
-            "malware_name": malware_name,
-            "malware_family": malware_family,
-            "detection_method": "Threat intelligence hash match"
-        }
+        verdict = _malware_verdict(file_path, file_hash, result)
     else:
         #call the file type detector and investigation modules here to do the actual analysis of the file.
         analysis_result = investigate_file(file_path)
@@ -72,8 +136,9 @@ def main(file_path, force: bool = False, cli_mode: bool = False):
 
 if __name__ == "__main__":
     # usage: python main.py <file_path> [--force] [--cli]
+    #        python main.py <directory> --cli [--force]
     if len(sys.argv) < 2 or len(sys.argv) > 4:
-        print("Usage: python main.py <file_path> [--force] [--cli]")
+        print("Usage: python main.py <file_path> [--force] [--cli]  |  python main.py <directory> --cli [--force]")
         sys.exit(1)
 
     force_flag = "--force" in sys.argv or "--force-update" in sys.argv
@@ -85,7 +150,7 @@ if __name__ == "__main__":
         file_arg = a
 
     if not file_arg:
-        print("Usage: python main.py <file_path> [--force] [--cli]")
+        print("Usage: python main.py <file_path> [--force] [--cli]  |  python main.py <directory> --cli [--force]")
         sys.exit(1)
 
     try:
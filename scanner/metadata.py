@@ -0,0 +1,19 @@
+"""Helpers for reading and merging metadata.json in the user data directory."""
+import json
+from paths import get_metadata_path
+
+def load_metadata():
+    """Return the stored metadata dict, or an empty dict if it is missing or unreadable."""
+    try:
+        with open(get_metadata_path(), "r", encoding="utf-8") as mf:
+            meta = json.load(mf)
+    except (OSError, ValueError):
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+def update_metadata(**fields):
+    """Merge fields into metadata.json, keeping keys written by other steps."""
+    meta = load_metadata()
+    meta.update(fields)
+    with open(get_metadata_path(), "w", encoding="utf-8") as mf:
+        json.dump(meta, mf)
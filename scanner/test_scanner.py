@@ -1,16 +1,12 @@
 #!/usr/bin/env python3
-import sqlite3
-from db import check_hash
+from db import check_hash, get_read_connection
 
 # Get a known malware hash from the database
-conn = sqlite3.connect("malware_hashes.db")
-c = conn.cursor()
-c.execute("SELECT sha256, malware_name, malware_family FROM malware_hashes LIMIT 1")
-result = c.fetchone()
-conn.close()
+result = get_read_connection().execute("SELECT sha256, malware_name, malware_family FROM malware_hashes LIMIT 1").fetchone()
 
 if result:
     known_hash, malware_name, malware_family = result
+    known_hash = known_hash.hex()  # stored as raw bytes; scans look up the hex digest
     print(f"Testing with known malware hash: {known_hash}")
     print(f"Expected: {malware_name} ({malware_family})\n")
     
@@ -0,0 +1,21 @@
+"""Helpers for MalwareBazaar's "YYYY-MM-DD HH:MM:SS" timestamps.
+
+The format is zero-padded, so well-formed values order correctly as plain
+strings and can be compared or max()'d without parsing them into datetimes.
+"""
+import re
+
+_TIMESTAMP_RE = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+
+def is_timestamp(s):
+    """Return True if s is a well-formed timestamp string."""
+    return isinstance(s, str) and _TIMESTAMP_RE.fullmatch(s) is not None
+
+def newest_timestamp(values):
+    """Return the latest well-formed timestamp in values, or None if there is none."""
+    newest = ""
+    for ts in values:
+        # cheap string compare first; only validate values that would win
+        if isinstance(ts, str) and ts > newest and is_timestamp(ts):
+            newest = ts
+    return newest or None
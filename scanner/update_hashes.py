@@ -1,8 +1,9 @@
 import os
-import hashlib
+import filecmp
 import requests
-import subprocess
 from paths import get_user_csv_path, get_user_data_dir
+from metadata import load_metadata, update_metadata
+from db import get_connection
 from init_db import init_user_db
 from import_hashes import import_user_hashes
 
@@ -15,31 +16,55 @@ CSV_FILE = get_user_csv_path()
 #Temporary file used to compare new download before replacing
 TMP_FILE = os.path.join(get_user_data_dir(), "hashes.csv.tmp")
 
+#Chunk size used when streaming the download to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 20
 
 
-#-----------------------------------------------------
-#Function: file_sha256
-#Purpose: Generate SHA-256 hash of a file
-#Used to compare old vs new CSV to detect changes
-#----------------------------------------------------
-def file_sha256(path):
-  sha256 = hashlib.sha256()
-  with open(path, "rb") as f:
-    for chunk in iter(lambda: f.read(8192), b""):
-      sha256.update(chunk)
-  return sha256.hexdigest()
-#----------------------------------------------------
+
+#---------------------------------------------------
+#Function: csv_changed
+#Purpose: Detect whether the new download differs from the
+#current CSV. Different sizes settle it without reading either
+#file; equal sizes fall back to a byte-for-byte comparison
+#---------------------------------------------------
+def csv_changed(old_path, new_path):
+  if os.path.getsize(old_path) != os.path.getsize(new_path):
+    return True
+  return not filecmp.cmp(old_path, new_path, shallow=False)
+#---------------------------------------------------
 #Function: download_csv
 #Purpose: Download the latest CSV from MalwareBazaar
 #Saves it as a temporary file
+#When conditional, sends the ETag/Last-Modified seen on the
+#previous download; returns None on 304 Not Modified, otherwise
+#the validators of the new response
 #---------------------------------------------------
-def download_csv():
+def download_csv(conditional: bool = True):
   print("Downloading latest CSV from MalwareBazaar...")
-  response = requests.get(CSV_URL, timeout=60)
-  response.raise_for_status()
+  headers = {}
+  if conditional:
+    meta = load_metadata()
+    if meta.get("http_etag"):
+      headers["If-None-Match"] = meta["http_etag"]
+    if meta.get("http_last_modified"):
+      headers["If-Modified-Since"] = meta["http_last_modified"]
 
-  with open(TMP_FILE, "wb") as f:
-    f.write(response.content)
+  # stream straight to disk in 1 MiB chunks instead of holding the whole CSV in memory;
+  # iter_content also undoes the gzip transfer encoding requests negotiates by default
+  with requests.get(CSV_URL, headers=headers, stream=True, timeout=60) as response:
+    if response.status_code == 304:
+      print("Server reports the CSV has not changed since the last download.")
+      return None
+    response.raise_for_status()
+
+    with open(TMP_FILE, "wb") as f:
+      for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+        f.write(chunk)
+
+    return {
+      "http_etag": response.headers.get("ETag"),
+      "http_last_modified": response.headers.get("Last-Modified"),
+    }
 #---------------------------------------------------
 #Function: rebuild_database
 #Purpose: Initialize DB schema and import hashes
@@ -47,50 +72,64 @@ def download_csv():
 #---------------------------------------------------
 def rebuild_database():
   print("Rebuilding database...")
-  # ensure DB schema exists before importing rows
-  init_user_db()
-  import_user_hashes()
+  # schema setup and import share one tuned connection
+  conn = get_connection()
+  try:
+    # ensure DB schema exists before importing rows
+    init_user_db(conn)
+    import_user_hashes(conn)
+  finally:
+    conn.close()
+#---------------------------------------------------
+#Function: report_no_update
+#Purpose: Shared handling for "CSV unchanged", rebuilding
+#anyway only when --force was given
+#---------------------------------------------------
+def report_no_update(force: bool):
+  print("No update detected.")
+  # honor explicit force request
+  if force:
+    print("Force flag set — rebuilding database despite identical CSV...")
+    rebuild_database()
+    print("Force rebuild complete.")
+  else:
+    print("No import required. To force a rebuild use --force.")
 #---------------------------------------------------
 #Function: main
 #Purpose: Controls update process
-#1. Download latest CSV
-#2. Compare with existing file
+#1. Download latest CSV (skipped on 304 Not Modified)
+#2. Compare with existing file (size, then bytes)
 #3. Replace if changed
 #4. Revuild database if needed
 #---------------------------------------------------
 def main(force: bool = False):
-  download_csv()
+  # only ask for a conditional response when there is a local CSV to fall back on
+  validators = download_csv(conditional=os.path.exists(CSV_FILE))
 
   # ensure DB schema exists (idempotent)
   init_user_db()
 
+  if validators is None:
+    report_no_update(force)
+    return
+
   # If this is the first time (no CSV exists yet)
   if not os.path.exists(CSV_FILE):
     os.replace(TMP_FILE, CSV_FILE)
+    update_metadata(**validators)
     print("Initial hashes.csv created.")
     rebuild_database()
     return
 
-  # Compare old and new file hashes
-  old_hash = file_sha256(CSV_FILE)
-  new_hash = file_sha256(TMP_FILE)
-
-  if old_hash == new_hash:
-    print("No update detected.")
-    # honor explicit force request
-    if force:
-      print("Force flag set — rebuilding database despite identical CSV...")
-      os.remove(TMP_FILE)
-      rebuild_database()
-      print("Force rebuild complete.")
-      return
-    else:
-      print("No import required. To force a rebuild use --force.")
-      os.remove(TMP_FILE)
-      return
+  # Compare old and new files
+  if not csv_changed(CSV_FILE, TMP_FILE):
+    os.remove(TMP_FILE)
+    update_metadata(**validators)
+    report_no_update(force)
   else:
     print("Update detected. Replacing hashes.csv...")
     os.replace(TMP_FILE, CSV_FILE)
+    update_metadata(**validators)
     rebuild_database()
     print("Update complete.")
 